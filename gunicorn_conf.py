@@ -0,0 +1,24 @@
+"""
+Gunicorn settings for running WebP Optimizer in production.
+
+Usage: gunicorn -c gunicorn_conf.py script:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 3756)}"
+
+# Conversion jobs and the file indexes live in process memory, so one worker
+# process has to serve every request (/status must reach the process running
+# the job). Threads give request concurrency, and conversions already use all
+# CPUs through that worker's process pool.
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 8))
+
+
+def post_worker_init(worker):
+    """Log the same startup checks as `python script.py` once the app is loaded."""
+    from script import log_startup_checks, logger
+    log_startup_checks()
+    logger.info(f"Starting WebP Optimizer v1.2 on {bind} with {threads} threads")
@@ -8,18 +8,51 @@ Version: 1.3
 """
 
 import os
+import shutil
+import time
 import logging
-from PIL import Image
-from flask import Flask, request, render_template, send_from_directory, jsonify
+import logging.handlers
+import atexit
+from PIL import Image, features
+from flask import Flask, Request, current_app, request, render_template, send_file, send_from_directory, jsonify
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
+from urllib.parse import quote
 import io
-import base64
+import ctypes
+import ctypes.util
+import functools
+import threading
+import queue
+import multiprocessing
+import uuid
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-# Configure logging
+try:
+    import simplejpeg  # Optional: faster libjpeg-turbo JPEG decoding
+except ImportError:
+    simplejpeg = None
+
+try:
+    import pyvips  # Optional: streaming decode/resize/encode pipeline
+except (ImportError, OSError):
+    pyvips = None
+
+# Configure logging; records are queued and written to stderr by a background thread,
+# so request handlers and the conversion loop never block on log I/O
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))  # log_handler applies the real format
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    handlers=[queue_handler]
 )
+log_listener.start()
+atexit.register(log_listener.stop)  # Flush queued records on shutdown
 logger = logging.getLogger('webp_optimizer')
 
 # Define global variables before use
@@ -29,72 +62,131 @@ clear_input_folder_on_startup = True  # Set to False if you don't want to clear
 class WebPConfig:
     """Configuration settings for WebP conversion."""
     COMPRESSION_MODES = {
-        1: {"quality": 80, "method": 6, "lossless": False, "description": "Balanced"},
-        2: {"quality": 90, "method": 6, "lossless": True, "description": "High Quality"},
-        3: {"quality": 60, "method": 6, "lossless": False, "description": "Maximum Compression"}
+        1: {"quality": 80, "method": 4, "lossless": False, "preset": "photo", "description": "Balanced"},
+        2: {"quality": 90, "method": 3, "lossless": True, "preset": "picture", "description": "High Quality"},
+        3: {"quality": 60, "method": 4, "lossless": False, "preset": "default", "description": "Maximum Compression"}
     }
     
+    # libwebp encoder effort: 0 is fastest, 6 is slowest with the smallest output
+    MIN_METHOD = 0
+    MAX_METHOD = 6
+    
     SUPPORTED_FORMATS = ('.png', '.jpg', '.jpeg', '.tiff', '.bmp', '.gif', '.webp')
+    SUPPORTED_EXT_SET = frozenset(SUPPORTED_FORMATS)  # For O(1) lookups of os.path.splitext() extensions
+    JPEG_FORMATS = ('.jpg', '.jpeg')
     MIN_DIMENSION = 100
     DEFAULT_DIMENSION = 2000
     DEFAULT_MODE = 1
+    REDUCING_GAP = 2  # Minimum scale left for LANCZOS after a box reduce
+    # Worker processes for batch conversion; defaults to the CPUs this process may run on
+    MAX_WORKERS = int(os.environ.get('MAX_WORKERS', 0)) or (
+        len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1)
+    GPU_RESIZE = os.environ.get('GPU_RESIZE', 'False').lower() in ('true', '1', 't')
+    GPU_MIN_DIMENSION = 4000  # Smaller images resize faster on the CPU than the upload costs
     THUMBNAIL_SIZE = 100  # Size for thumbnails (square)
+    THUMBNAIL_MAX_AGE = 24 * 60 * 60  # Thumbnail URLs are versioned by mtime, so browsers may cache them
+    OUTPUT_MAX_AGE = 60 * 60  # Browser cache lifetime for versioned (?v=mtime) output file URLs
+    JOB_RESULT_TTL = 10 * 60  # Seconds a finished conversion job stays pollable
+    THUMBNAIL_WORKERS = min(8, MAX_WORKERS)  # Threads generating thumbnails; Pillow releases the GIL while coding
+    UPLOAD_CHUNK_SIZE = 1024 * 1024  # Copy buffer for streaming uploads to disk
+    ENCODER = os.environ.get('WEBP_ENCODER', 'pillow').lower()  # 'pillow' or 'libwebp'
+    BACKEND = os.environ.get('IMAGE_BACKEND', 'pillow').lower()  # 'pillow' or 'vips'
     PORT = int(os.environ.get('PORT', 3756))
     DEBUG = os.environ.get('DEBUG', 'True').lower() in ('true', '1', 't')
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'False').lower() in ('true', '1', 't')
 
 
 # File handling class to centralize file operations
 class FileHandler:
     """Centralized file operations for WebP Optimizer"""
+    _thumbnail_pool = ThreadPoolExecutor(max_workers=WebPConfig.THUMBNAIL_WORKERS, thread_name_prefix='thumbnail')
+    _thumbnail_buffers = threading.local()  # One reusable encode buffer per thread
     
     @staticmethod
-    def create_thumbnail_b64(file_path):
-        """Create a base64 encoded thumbnail for an image"""
+    def create_thumbnail(file_path):
+        """Create a JPEG thumbnail for an image and return its bytes"""
         try:
             with Image.open(file_path) as img:
+                # Keep JPEG's reduced-scale decode, which thumbnail() would otherwise apply itself
+                img.draft(None, (WebPConfig.THUMBNAIL_SIZE * 2, WebPConfig.THUMBNAIL_SIZE * 2))
+                
+                # Convert before resizing, as thumbnail() cannot reduce every mode (e.g. I;16).
+                # JPEG can store L and RGB as they are; only other modes (P, CMYK, I;16...) need converting
+                if img.mode.startswith(('I', 'F')):
+                    # High bit depth: scale down to 8-bit instead of clipping everything to white
+                    img = img.convert('I')
+                    high = img.getextrema()[1]
+                    if high > 255:
+                        img = img.point(lambda v: v * 255 / high)
+                    img = img.convert('L')
+                elif img.mode not in ('RGB', 'L', 'RGBA', 'LA'):
+                    img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+                
                 # Create a thumbnail, preserving aspect ratio
                 img.thumbnail((WebPConfig.THUMBNAIL_SIZE, WebPConfig.THUMBNAIL_SIZE))
                 
-                # Convert to RGB if necessary (for transparent images)
+                # Flatten transparent images onto white in a single composite pass
                 if img.mode in ('RGBA', 'LA'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[3])  # 3 is the alpha channel
-                    img = background
+                    background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+                    img = Image.alpha_composite(background, img.convert('RGBA')).convert('RGB')
                 
-                # Save thumbnail to memory buffer
-                buffer = io.BytesIO()
-                img.save(buffer, format='JPEG', quality=70)
+                # Save thumbnail to this thread's memory buffer, reused across thumbnails
+                buffer = getattr(FileHandler._thumbnail_buffers, 'buffer', None)
+                if buffer is None:
+                    buffer = FileHandler._thumbnail_buffers.buffer = io.BytesIO()
                 buffer.seek(0)
-                
-                # Convert to base64
-                img_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                return f"data:image/jpeg;base64,{img_b64}"
+                buffer.truncate()
+                img.save(buffer, format='JPEG', quality=70)
+                return buffer.getvalue()
+        except FileNotFoundError:
+            # Removed or renamed before a background prewarm got to it
+            logger.debug(f"Skipped thumbnail for {file_path}: file no longer exists")
+            return None
         except Exception as e:
             logger.error(f"Error creating thumbnail for {file_path}: {str(e)}")
             return None
 
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def cached_thumbnail(file_path, mtime_ns, size):
+        """Memoized create_thumbnail; a changed mtime or size means a new cache entry."""
+        return FileHandler.create_thumbnail(file_path)
+
+    @staticmethod
+    def prewarm_thumbnail(file_path, mtime_ns, size):
+        """Generate a thumbnail in the background so the browser's /thumb request hits the cache."""
+        FileHandler._thumbnail_pool.submit(FileHandler.cached_thumbnail, file_path, mtime_ns, size)
+
+    @staticmethod
+    def get_file_data(name, file_path, size, mtime_ns=None):
+        """Build the listing entry for a single file, including its thumbnail URL."""
+        if mtime_ns is None:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+        # mtime versions the file's URLs, so changed files are refetched despite caching
+        file_data = {"name": name, "size": size, "mtime": mtime_ns}
+        
+        # Thumbnails are served by /thumb
+        if os.path.splitext(name)[1].lower() in WebPConfig.SUPPORTED_EXT_SET:
+            folder = os.path.basename(os.path.dirname(file_path))
+            file_data["thumbnail_url"] = f"/thumb/{folder}/{quote(name)}?v={mtime_ns}"
+            FileHandler.prewarm_thumbnail(file_path, mtime_ns, size)
+                
+        return file_data
+
     @staticmethod
     def get_files_with_sizes(directory):
         """Get all files in a directory with their sizes and thumbnails."""
         files = []
         try:
-            for file in os.listdir(directory):
-                # Skip .gitkeep files
-                if file == '.gitkeep':
-                    continue
-                    
-                file_path = os.path.join(directory, file)
-                if os.path.isfile(file_path):
-                    file_size = os.path.getsize(file_path)
-                    file_data = {"name": file, "size": file_size}
-                    
-                    # Generate thumbnail for supported image formats
-                    if file.lower().endswith(WebPConfig.SUPPORTED_FORMATS):
-                        thumbnail = FileHandler.create_thumbnail_b64(file_path)
-                        if thumbnail:
-                            file_data["thumbnail"] = thumbnail
-                            
-                    files.append(file_data)
+            # scandir serves the file type from the directory read, avoiding extra stat calls
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # Skip hidden files (.gitkeep, in-progress .tmp writes)
+                    if entry.name.startswith('.') or not entry.is_file():
+                        continue
+                        
+                    stat = entry.stat()
+                    files.append(FileHandler.get_file_data(entry.name, entry.path, stat.st_size, stat.st_mtime_ns))
             return files
         except Exception as e:
             logger.error(f"Error listing files in {directory}: {str(e)}")
@@ -105,11 +197,11 @@ class FileHandler:
         """Clear all files from a directory."""
         try:
             count = 0
-            for file in os.listdir(directory):
-                file_path = os.path.join(directory, file)
-                if os.path.isfile(file_path) and file != '.gitkeep':
-                    os.remove(file_path)
-                    count += 1
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name != '.gitkeep':
+                        os.remove(entry.path)
+                        count += 1
             if count > 0:
                 logger.info(f"✅ {dir_type.capitalize()} cleared successfully. ({count} files removed)")
             return count
@@ -117,6 +209,51 @@ class FileHandler:
             logger.error(f"❌ Error clearing {dir_type}: {str(e)}")
             return 0
             
+    @staticmethod
+    @contextmanager
+    def atomic_output(path):
+        """Yield a hidden temporary path that replaces path only if the block succeeds.
+
+        Readers (and /list_output polls) never see a partially written file. The temp
+        name is unique, since parallel workers can write the same output (dup.png and
+        dup.jpg both become dup.webp).
+        """
+        directory, name = os.path.split(path)
+        temp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+        try:
+            yield temp_path
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def prefetch(paths):
+        """Ask the kernel to start reading files into the page cache in the background."""
+        if not hasattr(os, 'posix_fadvise'):
+            return
+        for path in paths:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                finally:
+                    os.close(fd)
+            except OSError:
+                pass  # Only a hint; the worker will report real read errors
+
+    @staticmethod
+    def write_bytes(path, data):
+        """Write a whole buffer with as few write(2) calls as possible (normally one)."""
+        view = memoryview(data)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            # os.write may write less than asked, e.g. beyond the 2 GiB per-call cap on Linux
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
     @staticmethod
     def validate_file_operation(filename, directory, check_exists=True):
         """Validate a file operation with common checks."""
@@ -131,82 +268,639 @@ class FileHandler:
         return True, file_path
 
 
+class FileIndex:
+    """In-memory listing of a directory so list requests don't rescan it.
+
+    The directory is rescanned only when its mtime differs from the last scan,
+    a single stat per request, which also picks up changes made outside the app
+    (e.g. files dropped into a mounted volume). Handlers that change the
+    directory invalidate the index rather than patching it, so such outside
+    changes are never masked; thumbnails are memoized, so a rescan is cheap.
+    """
+    _indexes = {}
+    _indexes_lock = threading.Lock()
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._files = {}
+        self._mtime = None
+        self._version = 0  # Bumped on every change, for list ETags
+        self._token = uuid.uuid4().hex[:8]  # Keeps ETags from a previous process from matching
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, directory):
+        """Return the shared index for a directory, creating it on first use."""
+        with cls._indexes_lock:
+            if directory not in cls._indexes:
+                cls._indexes[directory] = cls(directory)
+            return cls._indexes[directory]
+
+    def _dir_mtime(self):
+        return os.stat(self.directory).st_mtime_ns
+
+    def list(self):
+        """Return the indexed files, rescanning only if the directory changed on disk."""
+        return self.snapshot()[1]
+
+    def snapshot(self):
+        """Return (etag, files) for the current listing, taken together under the lock."""
+        with self._lock:
+            mtime = self._dir_mtime()
+            if mtime != self._mtime:
+                files = FileHandler.get_files_with_sizes(self.directory)
+                self._files = {file_data["name"]: file_data for file_data in files}
+                self._mtime = mtime
+                self._version += 1
+            return f"{self._token}-{self._version}", list(self._files.values())
+
+    def invalidate(self):
+        """Force a rescan on the next listing, after the app has changed the directory."""
+        with self._lock:
+            self._mtime = None
+
+
+class _WebPConfigStruct(ctypes.Structure):
+    """struct WebPConfig from libwebp's encode.h (encoder ABI 0x020f)."""
+    _fields_ = [(name, ctypes.c_float if name in ('quality', 'target_PSNR') else ctypes.c_int) for name in (
+        'lossless', 'quality', 'method', 'image_hint', 'target_size', 'target_PSNR', 'segments',
+        'sns_strength', 'filter_strength', 'filter_sharpness', 'filter_type', 'autofilter',
+        'alpha_compression', 'alpha_filtering', 'alpha_quality', 'pass', 'show_compressed',
+        'preprocessing', 'partitions', 'partition_limit', 'emulate_jpeg_size', 'thread_level',
+        'low_memory', 'near_lossless', 'exact', 'use_delta_palette', 'use_sharp_yuv', 'qmin', 'qmax')]
+
+
+class _WebPPictureStruct(ctypes.Structure):
+    """struct WebPPicture from libwebp's encode.h; only the leading fields are used directly."""
+    _fields_ = [
+        ('use_argb', ctypes.c_int), ('colorspace', ctypes.c_int),
+        ('width', ctypes.c_int), ('height', ctypes.c_int),
+        ('y', ctypes.c_void_p), ('u', ctypes.c_void_p), ('v', ctypes.c_void_p),
+        ('y_stride', ctypes.c_int), ('uv_stride', ctypes.c_int),
+        ('a', ctypes.c_void_p), ('a_stride', ctypes.c_int), ('pad1', ctypes.c_uint32 * 2),
+        ('argb', ctypes.c_void_p), ('argb_stride', ctypes.c_int), ('pad2', ctypes.c_uint32 * 3),
+        ('writer', ctypes.c_void_p), ('custom_ptr', ctypes.c_void_p),
+        ('extra_info_type', ctypes.c_int), ('extra_info', ctypes.c_void_p), ('stats', ctypes.c_void_p),
+        ('error_code', ctypes.c_int), ('progress_hook', ctypes.c_void_p), ('user_data', ctypes.c_void_p),
+        ('pad3', ctypes.c_uint32 * 3), ('pad4', ctypes.c_void_p), ('pad5', ctypes.c_void_p),
+        ('pad6', ctypes.c_uint32 * 8), ('memory_', ctypes.c_void_p), ('memory_argb_', ctypes.c_void_p),
+        ('pad7', ctypes.c_void_p * 2),
+    ]
+
+
+class _WebPMemoryWriterStruct(ctypes.Structure):
+    """struct WebPMemoryWriter from libwebp's encode.h."""
+    _fields_ = [('mem', ctypes.c_void_p), ('size', ctypes.c_size_t),
+                ('max_size', ctypes.c_size_t), ('pad', ctypes.c_uint32 * 1)]
+
+
+class LibWebP:
+    """Minimal ctypes binding to the system libwebp advanced encoding API."""
+    ENCODER_ABI_VERSION = 0x020f
+    PRESETS = {"default": 0, "picture": 1, "photo": 2, "drawing": 3, "icon": 4, "text": 5}
+    _lib = None
+    _loaded = False
+
+    @classmethod
+    def load(cls):
+        """Load libwebp once per process; returns None if it is unavailable."""
+        if cls._loaded:
+            return cls._lib
+        cls._loaded = True
+
+        path = ctypes.util.find_library('webp')
+        if not path:
+            logger.warning("libwebp not found, falling back to Pillow's WebP encoder")
+            return None
+
+        try:
+            lib = ctypes.CDLL(path)
+            config_ptr = ctypes.POINTER(_WebPConfigStruct)
+            picture_ptr = ctypes.POINTER(_WebPPictureStruct)
+            writer_ptr = ctypes.POINTER(_WebPMemoryWriterStruct)
+            signatures = {
+                'WebPConfigInitInternal': ([config_ptr, ctypes.c_int, ctypes.c_float, ctypes.c_int], ctypes.c_int),
+                'WebPValidateConfig': ([config_ptr], ctypes.c_int),
+                'WebPPictureInitInternal': ([picture_ptr, ctypes.c_int], ctypes.c_int),
+                'WebPPictureImportRGB': ([picture_ptr, ctypes.c_char_p, ctypes.c_int], ctypes.c_int),
+                'WebPPictureImportRGBA': ([picture_ptr, ctypes.c_char_p, ctypes.c_int], ctypes.c_int),
+                'WebPPictureFree': ([picture_ptr], None),
+                'WebPMemoryWriterInit': ([writer_ptr], None),
+                'WebPMemoryWriterClear': ([writer_ptr], None),
+                'WebPEncode': ([config_ptr, picture_ptr], ctypes.c_int),
+                'WebPGetEncoderVersion': ([], ctypes.c_int),
+            }
+            for name, (argtypes, restype) in signatures.items():
+                function = getattr(lib, name)
+                function.argtypes = argtypes
+                function.restype = restype
+            # Passed to libwebp as the picture's writer callback, never called from Python
+            cls._memory_write = ctypes.cast(lib.WebPMemoryWrite, ctypes.c_void_p)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"Could not load libwebp from {path}, falling back to Pillow: {str(e)}")
+            return None
+
+        version = lib.WebPGetEncoderVersion()
+        logger.info(f"Using libwebp {version >> 16}.{(version >> 8) & 0xff}.{version & 0xff} from {path}")
+        cls._lib = lib
+        return lib
+
+    @classmethod
+    def encode(cls, image, quality, method, lossless=False, preset="default"):
+        """Encode an RGB or RGBA image to WebP with the given preset and return the bytes."""
+        lib = cls.load()
+
+        config = _WebPConfigStruct()
+        if not lib.WebPConfigInitInternal(ctypes.byref(config), cls.PRESETS[preset],
+                                          quality, cls.ENCODER_ABI_VERSION):
+            raise OSError("libwebp version is incompatible with this encoder binding")
+        config.method = method
+        config.lossless = int(lossless)
+        if not lib.WebPValidateConfig(ctypes.byref(config)):
+            raise ValueError("Invalid libwebp encoder configuration")
+
+        picture = _WebPPictureStruct()
+        if not lib.WebPPictureInitInternal(ctypes.byref(picture), cls.ENCODER_ABI_VERSION):
+            raise OSError("libwebp version is incompatible with this encoder binding")
+        picture.width, picture.height = image.size
+        picture.use_argb = int(lossless)  # Lossless encodes from ARGB, lossy from YUV
+
+        writer = _WebPMemoryWriterStruct()
+        lib.WebPMemoryWriterInit(ctypes.byref(writer))
+        picture.writer = cls._memory_write
+        picture.custom_ptr = ctypes.cast(ctypes.byref(writer), ctypes.c_void_p)
+
+        try:
+            channels = 4 if image.mode == 'RGBA' else 3
+            import_pixels = lib.WebPPictureImportRGBA if channels == 4 else lib.WebPPictureImportRGB
+            if not import_pixels(ctypes.byref(picture), image.tobytes(), image.size[0] * channels):
+                raise MemoryError("libwebp could not allocate the picture")
+            if not lib.WebPEncode(ctypes.byref(config), ctypes.byref(picture)):
+                raise OSError(f"libwebp failed to encode image (error code {picture.error_code})")
+            return ctypes.string_at(writer.mem, writer.size)
+        finally:
+            lib.WebPPictureFree(ctypes.byref(picture))
+            lib.WebPMemoryWriterClear(ctypes.byref(writer))
+
+
+class GPUResizer:
+    """Optional LANCZOS (3-lobe) resize on an NVIDIA GPU through CuPy.
+
+    The resize is separable, so it is done as two dense weight-matrix products,
+    which map onto cuBLAS. CuPy is imported lazily inside the conversion worker,
+    so CUDA is never initialised in the parent before the process pool forks.
+    """
+    _cupy = None
+    _numpy = None
+    _loaded = False
+
+    @classmethod
+    def load(cls):
+        """Import CuPy once per process; returns None if it is unavailable."""
+        if not cls._loaded:
+            cls._loaded = True
+            try:
+                import cupy
+                import numpy
+                cls._cupy, cls._numpy = cupy, numpy
+            except ImportError:
+                logger.warning("GPU_RESIZE is set but CuPy is not installed, resizing on the CPU")
+        return cls._cupy
+
+    @classmethod
+    def disable(cls, error):
+        """Stop using the GPU in this process after a failure (e.g. no usable CUDA device)."""
+        logger.warning(f"GPU resize failed, resizing on the CPU from now on: {str(error)}")
+        cls._cupy = None
+        cls.device_weights.cache_clear()
+
+    @classmethod
+    def lanczos_weights(cls, in_size, out_size):
+        """Return the (out_size, in_size) LANCZOS matrix, widened for downscaling like Pillow's."""
+        np = cls._numpy
+        scale = in_size / out_size
+        support = max(scale, 1.0)
+        centers = (np.arange(out_size) + 0.5) * scale
+        distance = ((np.arange(in_size) + 0.5)[None, :] - centers[:, None]) / support
+        weights = np.sinc(distance) * np.sinc(distance / 3) * (np.abs(distance) < 3)
+        weights /= weights.sum(axis=1, keepdims=True)
+        return weights.astype(np.float32)
+
+    @classmethod
+    @functools.lru_cache(maxsize=8)
+    def device_weights(cls, in_size, out_size):
+        """LANCZOS matrix uploaded to the GPU, memoised since a batch of photos
+        from the same camera shares the same source and target dimensions."""
+        return cls._cupy.asarray(cls.lanczos_weights(in_size, out_size))
+
+    @classmethod
+    def resize(cls, image, size):
+        """Resize an RGB, RGBA or LA image to size on the GPU."""
+        cp = cls._cupy
+        pixels = cp.asarray(cls._numpy.asarray(image), dtype=cp.float32)
+        has_alpha = image.mode in ('RGBA', 'LA')
+        if has_alpha:
+            # Premultiply so transparent pixels don't bleed their colour into edges
+            pixels[..., :-1] *= pixels[..., -1:] / 255
+
+        vertical = cls.device_weights(image.height, size[1])
+        horizontal = cls.device_weights(image.width, size[0])
+        pixels = cp.einsum('oh,hwc->owc', vertical, pixels)
+        pixels = cp.einsum('pw,owc->opc', horizontal, pixels)
+
+        if has_alpha:
+            alpha = cp.clip(pixels[..., -1:], 0, 255)
+            pixels[..., :-1] *= 255 / cp.maximum(alpha, 1e-6)
+        pixels = cp.clip(cp.rint(pixels), 0, 255).astype(cp.uint8)
+        return Image.fromarray(cp.asnumpy(pixels))
+
+
 class ImageProcessor:
     """Image processing operations for WebP conversion"""
     
+    @staticmethod
+    def open_image(input_path, max_dim=None):
+        """Open an image, decoding JPEGs with simplejpeg when it is available.
+
+        When max_dim is given and a JPEG is larger than that, the decoder is asked
+        to scale down by 1/2, 1/4 or 1/8 during the IDCT instead of producing the
+        full-resolution bitmap. The largest reduction that still covers the final
+        size is used, so resize_image only has the remaining fraction to do.
+        """
+        if simplejpeg is not None and input_path.lower().endswith(WebPConfig.JPEG_FORMATS):
+            try:
+                with open(input_path, 'rb') as f:
+                    data = f.read()
+                min_width = min_height = 0
+                if max_dim:
+                    height, width, _, _ = simplejpeg.decode_jpeg_header(data)
+                    min_width, min_height = ImageProcessor.target_size((width, height), max_dim)
+                pixels = simplejpeg.decode_jpeg(data, colorspace='RGB', fastdct=True,
+                                                min_width=min_width, min_height=min_height)
+                return Image.fromarray(pixels)
+            except Exception as e:
+                # e.g. CMYK JPEGs, which Pillow can still convert
+                logger.debug(f"simplejpeg could not decode {input_path}, falling back to Pillow: {str(e)}")
+
+        image = Image.open(input_path)
+        if max_dim and image.format == 'JPEG':
+            image.draft('RGB', ImageProcessor.target_size(image.size, max_dim))
+        return image
+
+    @staticmethod
+    def target_size(size, max_dim):
+        """Return the size an image ends up at after fitting it within max_dim."""
+        width, height = size
+        if max(width, height) > max_dim:
+            scale = max_dim / max(width, height)
+            return (int(width * scale), int(height * scale))
+        return size
+
     @staticmethod
     def resize_image(image, max_dim):
         """Resize image while maintaining aspect ratio if it exceeds max_dim."""
         width, height = image.size
 
         if max(width, height) > max_dim:
-            scale = max_dim / max(width, height)
-            new_size = (int(width * scale), int(height * scale))
-            return image.resize(new_size, Image.LANCZOS)
+            new_size = ImageProcessor.target_size(image.size, max_dim)
+            
+            if (WebPConfig.GPU_RESIZE and max(width, height) > WebPConfig.GPU_MIN_DIMENSION
+                    and image.mode in ('RGB', 'RGBA', 'LA') and GPUResizer.load()):
+                try:
+                    return GPUResizer.resize(image, new_size)
+                except Exception as e:
+                    # CuPy imports without a working GPU and only fails here; fall back to the CPU
+                    GPUResizer.disable(e)
+                
+            # An exact integer downscale is a single box reduce, with no LANCZOS pass
+            factor = max(width, height) // max_dim
+            if (factor >= 2 and (width / factor, height / factor) == new_size
+                    and image.mode in ('L', 'LA', 'RGB', 'RGBA')):
+                return image.reduce(factor)
+            # Otherwise Pillow box-reduces first, so LANCZOS only covers the last 2-4x
+            return image.resize(new_size, Image.LANCZOS, reducing_gap=WebPConfig.REDUCING_GAP)
         
         return image  # Return original image if no resizing is needed
 
     @staticmethod
-    def convert_to_webp(input_path, output_path, compression_mode, max_dim):
-        """Convert image to WebP with resizing & compression settings."""
-        try:
-            logger.info(f"Converting {input_path} to {output_path}")
-            image = Image.open(input_path)
-            image = ImageProcessor.resize_image(image, max_dim)  # Resize if needed
+    def convert_with_vips(input_path, output_path, config, max_dim, method):
+        """Convert with libvips, which streams decode, resize and encode without
+        holding the full-resolution bitmap in memory.
+
+        thumbnail() shrinks on load, so large JPEGs (and WebPs) are decoded
+        directly at a reduced scale before the final lanczos3 resize.
+        """
+        # size='down' never upscales; no_rotate matches the Pillow path, which ignores EXIF orientation
+        image = pyvips.Image.thumbnail(input_path, max_dim, height=max_dim, size='down', no_rotate=True)
 
+        # Same rule as the Pillow path: alpha images, and palette images that were not resized,
+        # are encoded losslessly in lossless modes (libvips < 8.15 calls the field palette-bit-depth)
+        source = pyvips.Image.new_from_file(input_path)  # Header only; pixels are never decoded
+        palette = (any(field in source.get_fields() for field in ('palette', 'palette-bit-depth'))
+                   and max(source.width, source.height) <= max_dim)
+        lossless = config["lossless"] and (image.hasalpha() or palette)
+
+        with FileHandler.atomic_output(output_path) as temp_path:
+            # strip drops EXIF/XMP/ICC metadata, matching the Pillow path
+            image.webpsave(temp_path, Q=config["quality"], effort=method, preset=config["preset"],
+                           lossless=lossless, strip=True)
+
+    @staticmethod
+    def convert_to_webp(input_path, output_path, compression_mode, max_dim, method=None):
+        """Convert image to WebP with resizing & compression settings.
+
+        method overrides the compression mode's libwebp encoder effort when given.
+        Returns the size of the written file in bytes, or None if conversion failed.
+        """
+        try:
+            logger.debug(f"Converting {input_path} to {output_path}")
+            
             # Get compression settings
             config = WebPConfig.COMPRESSION_MODES.get(compression_mode, WebPConfig.COMPRESSION_MODES[WebPConfig.DEFAULT_MODE])
             quality = config["quality"]
-            method = config["method"]
+            if method is None:
+                method = config["method"]
             lossless = config["lossless"]
             
-            # Handle based on image mode
-            save_params = {"quality": quality, "method": method}
-            
-            if image.mode in ('RGBA', 'LA'):
-                # Handle images with transparency
-                save_params["lossless"] = lossless
-            else:
-                # Convert to RGB for non-transparent images
-                image = image.convert('RGB')
+            if WebPConfig.BACKEND == 'vips' and pyvips is not None:
+                ImageProcessor.convert_with_vips(input_path, output_path, config, max_dim, method)
+                return os.path.getsize(output_path)
+                
+            with ImageProcessor.open_image(input_path, max_dim) as source:
+                # Decode now; Pillow releases the input file once the pixels are loaded
+                source.load()
+                image = source
+                # Palette images kept at their size still have <= 256 colors, which lossless
+                # WebP stores with its color-indexing transform far smaller than lossy does
+                palette = image.mode == 'P' and max(image.size) <= max_dim
+                
+                # Settle on the encoder's mode before resizing, so LANCZOS runs once on the
+                # final channels and no second full-size copy is needed afterwards
+                if image.mode not in ('RGB', 'RGBA', 'LA'):
+                    has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+                    image = image.convert('RGBA' if has_alpha else 'RGB')
+                image = ImageProcessor.resize_image(image, max_dim)  # Resize if needed
+                if image is not source:
+                    # Free the full-size decode before the encoder allocates its buffers
+                    source.close()
+
+                # Handle based on image mode
+                save_params = {"quality": quality, "method": method}
                 
-            image.save(output_path, 'WEBP', **save_params)
-            return True
+                if image.mode in ('RGBA', 'LA') or palette:
+                    # Handle images with transparency, and palette graphics
+                    save_params["lossless"] = lossless
+                    
+                # Pillow cannot pass libwebp presets, so the native encoder is preferred when enabled
+                if WebPConfig.ENCODER == 'libwebp' and image.mode in ('RGB', 'RGBA') and LibWebP.load():
+                    data = LibWebP.encode(image, quality, method, save_params.get("lossless", False),
+                                          config["preset"])
+                else:
+                    buffer = io.BytesIO()
+                    image.save(buffer, 'WEBP', **save_params)
+                    data = buffer.getbuffer()
+                image.close()
+                
+            # Encode fully in memory, then hand the kernel the whole file in one write
+            with FileHandler.atomic_output(output_path) as temp_path:
+                FileHandler.write_bytes(temp_path, data)
+            return len(data)
         except Exception as e:
             logger.error(f"Error converting {input_path}: {str(e)}")
-            return False
+            return None
 
     @staticmethod
-    def process_images(input_dir, output_dir, compression_mode, max_dim):
-        """Process all images in input directory and convert to WebP."""
-        conversion_count = 0
+    def copy_webp_if_fits(input_path, output_path, max_dim):
+        """Copy a WebP input that already fits within max_dim, skipping a lossy re-encode.
 
+        Returns the size of the copy, or None if the image still has to be converted.
+        """
+        try:
+            with Image.open(input_path) as image:
+                if max(image.size) > max_dim:
+                    return None
+            with FileHandler.atomic_output(output_path) as temp_path:
+                shutil.copyfile(input_path, temp_path)
+        except Exception as e:
+            # Leave it to the conversion worker, which reports unreadable files
+            logger.debug(f"Could not copy {input_path} as-is: {str(e)}")
+            return None
+        logger.debug(f"{input_path} is already WebP within {max_dim}px, copied as-is")
+        return os.path.getsize(output_path)
+
+    @staticmethod
+    def process_images(input_dir, output_dir, compression_mode, max_dim, method=None, progress=None):
+        """Process all images in input directory and convert to WebP in parallel.
+
+        progress, if given, is called as progress(done, total) while files finish.
+        Returns (name, size) pairs for the output files that were written, sized
+        by the worker right after saving so callers needn't stat them again.
+        """
         logger.info(f"Looking for files in: {input_dir}")
-        files_in_input = os.listdir(input_dir)
+        with os.scandir(input_dir) as entries:
+            files_in_input = [(entry.name, entry.path) for entry in entries if entry.is_file()]
         logger.info(f"Files found: {len(files_in_input)}")
 
-        for filename in files_in_input:
-            if filename == '.gitkeep':
+        start_time = time.perf_counter()
+        tasks = []
+        converted_files = []
+        for filename, input_path in files_in_input:
+            if filename.startswith('.'):
                 continue
                 
-            if filename.lower().endswith(WebPConfig.SUPPORTED_FORMATS):
-                input_path = os.path.join(input_dir, filename)
-                output_path = os.path.join(output_dir, f"{os.path.splitext(filename)[0]}.webp")
-                logger.info(f"Processing {filename}...")
-                if ImageProcessor.convert_to_webp(input_path, output_path, compression_mode, max_dim):
-                    conversion_count += 1
-                    logger.info(f"✅ Converted: {filename}")
+            stem, ext = os.path.splitext(filename)
+            if ext.lower() in WebPConfig.SUPPORTED_EXT_SET:
+                output_path = os.path.join(output_dir, f"{stem}.webp")
+                # WebPs that already fit are copied here instead of occupying a worker
+                if ext.lower() == '.webp':
+                    size = ImageProcessor.copy_webp_if_fits(input_path, output_path, max_dim)
+                    if size is not None:
+                        converted_files.append((os.path.basename(output_path), size))
+                        continue
+                logger.debug(f"Processing {filename}...")
+                tasks.append((input_path, output_path, compression_mode, max_dim, method))
+
+        copied = len(converted_files)
+        total = copied + len(tasks)
+        if not total:
+            return []
+
+        if progress:
+            progress(copied, total)
+        if not tasks:
+            logger.info(f"✅ Copied {copied} WebP files that needed no conversion")
+            return converted_files
+
+        # Each image is an independent CPU-bound encode, so spread them across cores.
+        # The pool is created per batch and never larger than the batch itself.
+        workers = min(len(tasks), WebPConfig.MAX_WORKERS)
+        # Keep reads a couple of images ahead of the encoders so disk latency overlaps CPU work
+        lookahead = 2 * workers
+        FileHandler.prefetch(task[0] for task in tasks[:lookahead])
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(),
+                                 initializer=_init_worker_logging) as executor:
+            results = executor.map(_convert_star, tasks, chunksize=1)
+            for done, (task, converted) in enumerate(zip(tasks, results), 1):
+                FileHandler.prefetch(task[0] for task in tasks[done + lookahead - 1:done + lookahead])
+                if converted is not None:
+                    converted_files.append((os.path.basename(task[1]), converted))
+                    logger.debug(f"✅ Converted: {os.path.basename(task[0])}")
+                if progress:
+                    progress(copied + done, total)
+
+        logger.info(f"✅ Converted {len(converted_files)} of {total} files in "
+                    f"{time.perf_counter() - start_time:.2f}s")
+        return converted_files
+
+
+def _pool_context():
+    """Start method for the conversion pool.
+
+    Forking copies whatever locks other threads (thumbnail prewarm, request
+    handlers) hold at that moment, such as the import lock Pillow takes when
+    it loads a format plugin, and the worker then deadlocks on it. A
+    forkserver starts workers from a clean single-threaded process instead.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return None  # Windows, which only spawns
+    context = multiprocessing.get_context('forkserver')
+    # Import the heavy dependencies once in the server rather than in every worker.
+    # Not this module itself: importing it starts the log listener thread.
+    context.set_forkserver_preload(['flask', 'PIL.Image'])
+    return context
+
+
+def _init_worker_logging():
+    """Make pool workers log straight to stderr.
+
+    The listener thread draining the queue does not survive into the worker,
+    and workers exit without running atexit handlers.
+    """
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(log_handler)
+
+
+def _convert_star(args):
+    """Unpack a task tuple for the process pool (module-level so it can be pickled)."""
+    return ImageProcessor.convert_to_webp(*args)
+
+
+class ConversionJobs:
+    """Background queue that runs conversions off the request thread.
 
-        return conversion_count
+    /convert enqueues a job and returns its id straight away; the client polls
+    /status/<job_id> for progress and the final result.
+    """
+    _queue = queue.Queue()
+    _jobs = {}
+    _lock = threading.Lock()
+    _worker = None
+
+    @classmethod
+    def submit(cls, input_dir, output_dir, compression_mode, max_dim, method=None):
+        """Queue a conversion of input_dir and return its job id."""
+        job_id = uuid.uuid4().hex
+        with cls._lock:
+            # Results are kept for repeat polls (retries, a second tab), so expire old ones here
+            expired = time.monotonic() - WebPConfig.JOB_RESULT_TTL
+            for old_id in [i for i, job in cls._jobs.items() if job.get("finished_at", expired) < expired]:
+                del cls._jobs[old_id]
+            cls._jobs[job_id] = {"finished": False, "done": 0, "total": None}
+            # Started lazily so importing the module never spawns threads
+            if cls._worker is None:
+                cls._worker = threading.Thread(target=cls._run, name="conversion-worker", daemon=True)
+                cls._worker.start()
+        cls._queue.put((job_id, (input_dir, output_dir, compression_mode, max_dim, method)))
+        return job_id
+
+    @classmethod
+    def status(cls, job_id):
+        """Return a job's state, or None if unknown or expired."""
+        with cls._lock:
+            job = cls._jobs.get(job_id)
+            if job is None:
+                return None
+            return {key: value for key, value in job.items() if key != "finished_at"}
+
+    @classmethod
+    def _update(cls, job_id, **values):
+        with cls._lock:
+            cls._jobs[job_id].update(values)
+
+    @classmethod
+    def _run(cls):
+        while True:
+            job_id, args = cls._queue.get()
+            try:
+                result = cls._convert(job_id, *args)
+            except Exception as e:
+                logger.error(f"Error in conversion job {job_id}: {str(e)}")
+                result = {"success": False, "message": f"Conversion error: {str(e)}"}
+            cls._update(job_id, finished=True, finished_at=time.monotonic(), **result)
+            cls._queue.task_done()
+
+    @classmethod
+    def _convert(cls, job_id, input_dir, output_dir, compression_mode, max_dim, method):
+        converted_files = ImageProcessor.process_images(
+            input_dir,
+            output_dir,
+            compression_mode,
+            max_dim,
+            method,
+            progress=lambda done, total: cls._update(job_id, done=done, total=total)
+        )
+
+        if not converted_files:
+            return {
+                "success": False,
+                "message": "No files were converted. Please upload images first."
+            }
+
+        output_index = FileIndex.get(output_dir)
+        output_index.invalidate()
+        return {
+            "success": True,
+            "message": f"Conversion complete! {len(converted_files)} images converted.",
+            "output_files": output_index.list()
+        }
+
+
+class UploadRequest(Request):
+    """Request that spools uploaded files straight into the input folder.
+
+    Werkzeug would buffer each file in memory (or /tmp) and the upload handler
+    would then copy it; here the form parser writes to a hidden file next to
+    its destination, which the handler only has to rename.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        temp_path = os.path.join(current_app.config['UPLOAD_FOLDER'], f".upload-{uuid.uuid4().hex}")
+        # Recorded here, as files is never populated if parsing fails partway (e.g. a truncated body)
+        self.__dict__.setdefault('_spool_paths', []).append(temp_path)
+        return open(temp_path, 'wb+')
+
+    def close(self):
+        """Close the uploaded files and delete any spool file the handler did not move into place."""
+        super().close()
+        for temp_path in self.__dict__.get('_spool_paths', ()):
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass  # Renamed into place by upload_files
 
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 
 # Use absolute paths to ensure files are saved in the correct location
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 app.config['UPLOAD_FOLDER'] = os.path.join(BASE_DIR, 'input')
 app.config['OUTPUT_FOLDER'] = os.path.join(BASE_DIR, 'output')
 app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_SIZE', 16 * 1024 * 1024))  # 16 MB limit
+# Let a fronting web server send output files itself with sendfile(2)
+app.config['USE_X_SENDFILE'] = WebPConfig.USE_X_SENDFILE
 
 # Make sure directories exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -220,17 +914,29 @@ def index():
     global clear_input_folder_on_startup
     if clear_input_folder_on_startup:
         FileHandler.clear_directory(app.config['UPLOAD_FOLDER'], "input folder")
+        FileIndex.get(app.config['UPLOAD_FOLDER']).invalidate()
         clear_input_folder_on_startup = False
     
     return render_template('index.html')
 
 
+def listing_response(directory):
+    """JSON listing of a directory, answered with 304 Not Modified if the client's copy is current."""
+    etag, files = FileIndex.get(directory).snapshot()
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify({"success": True, "files": files})
+    response.set_etag(etag)
+    response.cache_control.no_cache = True  # Always revalidate; the ETag makes that cheap
+    return response
+
+
 @app.route('/list_output')
 def list_output():
     """Return a list of files in the output directory with their sizes."""
     try:
-        output_files = FileHandler.get_files_with_sizes(app.config['OUTPUT_FOLDER'])
-        return jsonify({"success": True, "files": output_files})
+        return listing_response(app.config['OUTPUT_FOLDER'])
     except Exception as e:
         logger.error(f"Error in list_output: {str(e)}")
         return jsonify({"success": False, "message": str(e), "files": []})
@@ -240,8 +946,7 @@ def list_output():
 def list_input():
     """Return a list of files in the input directory with their sizes."""
     try:
-        input_files = FileHandler.get_files_with_sizes(app.config['UPLOAD_FOLDER'])
-        return jsonify({"success": True, "files": input_files})
+        return listing_response(app.config['UPLOAD_FOLDER'])
     except Exception as e:
         logger.error(f"Error in list_input: {str(e)}")
         return jsonify({"success": False, "message": str(e), "files": []})
@@ -252,6 +957,7 @@ def clear_output():
     """Clear all files from the output directory."""
     try:
         count = FileHandler.clear_directory(app.config['OUTPUT_FOLDER'], "output folder")
+        FileIndex.get(app.config['OUTPUT_FOLDER']).invalidate()
         return jsonify({"success": True, "message": f"Output folder cleared successfully. {count} files removed."})
     except Exception as e:
         logger.error(f"Error clearing output folder: {str(e)}")
@@ -263,6 +969,7 @@ def clear_input():
     """Clear all files from the input directory."""
     try:
         count = FileHandler.clear_directory(app.config['UPLOAD_FOLDER'], "input folder")
+        FileIndex.get(app.config['UPLOAD_FOLDER']).invalidate()
         return jsonify({"success": True, "message": f"Input folder cleared successfully. {count} files removed."})
     except Exception as e:
         logger.error(f"Error clearing input folder: {str(e)}")
@@ -280,17 +987,30 @@ def upload_files():
         files = request.files.getlist('files[]')
         logger.info(f"Received {len(files)} files: {[file.filename for file in files]}")
         
+        input_index = FileIndex.get(app.config['UPLOAD_FOLDER'])
         file_count = 0
         for file in files:
             if file and file.filename:
                 filename = secure_filename(file.filename)
+                if not filename:
+                    # e.g. a name made only of non-ASCII characters; UploadRequest cleans up its spool file
+                    logger.warning(f"Skipped upload with unusable file name: {file.filename}")
+                    continue
                 save_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(save_path)
+                temp_path = getattr(file.stream, 'name', None)
+                if isinstance(temp_path, str):
+                    # Already spooled to disk by UploadRequest; renaming is atomic and copies nothing
+                    file.stream.close()
+                    os.replace(temp_path, save_path)
+                else:
+                    with open(save_path, 'wb') as out:
+                        shutil.copyfileobj(file.stream, out, WebPConfig.UPLOAD_CHUNK_SIZE)
+                input_index.invalidate()
                 file_count += 1
                 logger.info(f"Saved file: {filename}")
 
         if file_count > 0:
-            input_files = FileHandler.get_files_with_sizes(app.config['UPLOAD_FOLDER'])
+            input_files = input_index.list()
             return jsonify({
                 "success": True, 
                 "message": f"{file_count} files uploaded successfully!",
@@ -305,11 +1025,13 @@ def upload_files():
 
 @app.route('/convert', methods=['POST'])
 def convert():
-    """Convert images in the input folder to WebP format."""
+    """Start converting images in the input folder to WebP format."""
     try:
         # Get parameters from the form
         compression_mode = int(request.form.get('compression_mode', WebPConfig.DEFAULT_MODE))
         max_dim = int(request.form.get('max_dim', WebPConfig.DEFAULT_DIMENSION))
+        method = request.form.get('method', '')
+        method = int(method) if method.strip() else None
         
         # Validate parameters
         if max_dim < WebPConfig.MIN_DIMENSION:
@@ -317,32 +1039,35 @@ def convert():
             
         if compression_mode not in WebPConfig.COMPRESSION_MODES:
             compression_mode = WebPConfig.DEFAULT_MODE
+            
+        if method is not None:
+            method = min(max(method, WebPConfig.MIN_METHOD), WebPConfig.MAX_METHOD)
 
-        # Process images
-        conversion_count = ImageProcessor.process_images(
+        # Process images in the background
+        job_id = ConversionJobs.submit(
             app.config['UPLOAD_FOLDER'],
             app.config['OUTPUT_FOLDER'],
             compression_mode,
-            max_dim
+            max_dim,
+            method
         )
-
-        if conversion_count > 0:
-            output_files = FileHandler.get_files_with_sizes(app.config['OUTPUT_FOLDER'])
-            return jsonify({
-                "success": True, 
-                "message": f"Conversion complete! {conversion_count} images converted.",
-                "output_files": output_files
-            })
-        else:
-            return jsonify({
-                "success": False,
-                "message": "No files were converted. Please upload images first."
-            })
+        return jsonify({"success": True, "message": "Conversion started", "jobid": job_id})
     except Exception as e:
         logger.error(f"Error in convert: {str(e)}")
         return jsonify({"success": False, "message": f"Conversion error: {str(e)}"})
 
 
+@app.route('/status/<job_id>')
+def conversion_status(job_id):
+    """Report the progress of a conversion job, and its result once finished."""
+    job = ConversionJobs.status(job_id)
+    if job is None:
+        return jsonify({"success": False, "finished": True, "message": f"Unknown or expired conversion job: {job_id}"})
+    if not job["finished"]:
+        job["success"] = True
+    return jsonify(job)
+
+
 @app.route('/output/<filename>')
 def download_file(filename):
     """Serve files from the output directory."""
@@ -350,12 +1075,32 @@ def download_file(filename):
         # Use send_from_directory with as_attachment=True to force download
         # But only when the download parameter is present
         as_attachment = 'download' in request.args
-        return send_from_directory(app.config['OUTPUT_FOLDER'], filename, as_attachment=as_attachment)
+        # conditional lets unchanged files be answered with 304 Not Modified. Only URLs
+        # versioned with the file's mtime may be cached, since outputs can be overwritten.
+        max_age = WebPConfig.OUTPUT_MAX_AGE if 'v' in request.args else 0
+        return send_from_directory(app.config['OUTPUT_FOLDER'], filename,
+                                   as_attachment=as_attachment, conditional=True, max_age=max_age)
     except Exception as e:
         logger.error(f"Error serving file {filename}: {str(e)}")
         return jsonify({"success": False, "message": f"File not found: {filename}"})
 
 
+@app.route('/thumb/<folder>/<filename>')
+def thumbnail(folder, filename):
+    """Serve a JPEG thumbnail of a file in the input or output directory."""
+    try:
+        directories = {"input": app.config['UPLOAD_FOLDER'], "output": app.config['OUTPUT_FOLDER']}
+        file_path = safe_join(directories[folder], filename)
+        stat = os.stat(file_path)
+        data = FileHandler.cached_thumbnail(file_path, stat.st_mtime_ns, stat.st_size)
+        if data is None:
+            return jsonify({"success": False, "message": f"Could not create thumbnail for {filename}"})
+        return send_file(io.BytesIO(data), mimetype='image/jpeg', max_age=WebPConfig.THUMBNAIL_MAX_AGE)
+    except Exception as e:
+        logger.error(f"Error serving thumbnail {folder}/{filename}: {str(e)}")
+        return jsonify({"success": False, "message": f"File not found: {filename}"})
+
+
 @app.route('/rename_output_file', methods=['POST'])
 def rename_output_file():
     """Rename a file in the output directory."""
@@ -392,9 +1137,11 @@ def rename_output_file():
         
         # Rename the file
         os.rename(old_path, new_path)
+        output_index = FileIndex.get(app.config['OUTPUT_FOLDER'])
+        output_index.invalidate()
         
         # Return updated file list
-        output_files = FileHandler.get_files_with_sizes(app.config['OUTPUT_FOLDER'])
+        output_files = output_index.list()
         return jsonify({
             "success": True, 
             "message": f"File renamed successfully from {old_name} to {new_name}",
@@ -425,9 +1172,11 @@ def remove_input_file():
         
         # Remove the file
         os.remove(file_path)
+        input_index = FileIndex.get(app.config['UPLOAD_FOLDER'])
+        input_index.invalidate()
         
         # Return updated file list
-        input_files = FileHandler.get_files_with_sizes(app.config['UPLOAD_FOLDER'])
+        input_files = input_index.list()
         return jsonify({
             "success": True, 
             "message": f"File {file_name} removed successfully",
@@ -439,6 +1188,16 @@ def remove_input_file():
         return jsonify({"success": False, "message": f"Error removing file: {str(e)}"})
 
 
+def log_startup_checks():
+    """Warn about missing optional speedups; called by both the dev server and gunicorn."""
+    if not features.check_feature('libjpeg_turbo'):
+        logger.warning("Pillow was built without libjpeg-turbo; JPEG decoding will be noticeably slower")
+    if WebPConfig.BACKEND == 'vips' and pyvips is None:
+        logger.warning("IMAGE_BACKEND=vips but pyvips/libvips is not available, using Pillow")
+
+
 if __name__ == "__main__":
+    # Development server; production deployments run gunicorn -c gunicorn_conf.py script:app
+    log_startup_checks()
     logger.info(f"Starting WebP Optimizer v1.2 on port {WebPConfig.PORT}")
     app.run(host='0.0.0.0', port=WebPConfig.PORT, debug=WebPConfig.DEBUG)
\ No newline at end of file